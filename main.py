@@ -11,18 +11,39 @@ Typical usage example:
     # Server starts and listens for MCP requests via stdio transport
 """
 
+from __future__ import annotations
+
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 # Add src directory to Python path for imports
 src_path = Path(__file__).parent / "src"
 sys.path.insert(0, str(src_path))
 
-from vfx_mcp import create_mcp_server  # noqa: E402
+if TYPE_CHECKING:
+    from fastmcp import FastMCP
+
+
+def __getattr__(name: str) -> FastMCP[None]:
+    """Build the MCP server on first access to ``main.mcp`` (PEP 562).
+
+    Importing this module stays cheap: ffmpeg-python, FastMCP and the tool
+    registry are only loaded once the server is actually needed. The server
+    is still exposed as ``mcp`` for testing.
+    """
+    if name != "mcp":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    from vfx_mcp import create_mcp_server
+
+    mcp: FastMCP[None] = create_mcp_server()
+    globals()["mcp"] = mcp
+    return mcp
 
-# Initialize the MCP server (exposed for testing)
-mcp = create_mcp_server()
 
 # Run the server when called directly
 if __name__ == "__main__":
-    mcp.run()
+    from vfx_mcp.core.server import main
+
+    main()
@@ -2,15 +2,29 @@
 
 from .utilities import (
     COLOR_MAP,
+    ENCODER_CODECS,
     create_standard_output,
+    get_stream_codecs,
     get_video_metadata,
+    get_video_metadata_async,
     handle_ffmpeg_error,
+    hw_decode_options,
     log_operation,
     parse_color,
     parse_resolution,
     parse_size_range,
+    pick_video_encoder,
+    probe_media,
+    probe_media_async,
+    run_ffmpeg,
+    select_codec,
+    video_encoder_options,
 )
 from .validation import (
+    ANIMATION_TYPES,
+    FILTER_NAMES,
+    TRANSITION_TYPES,
+    parse_scale_filter,
     validate_animation_type,
     validate_file_path,
     validate_filter_name,
@@ -22,12 +36,22 @@ from .validation import (
 
 __all__ = [
     "handle_ffmpeg_error",
+    "hw_decode_options",
     "log_operation",
     "get_video_metadata",
+    "get_video_metadata_async",
+    "get_stream_codecs",
     "create_standard_output",
     "parse_color",
     "parse_resolution",
     "parse_size_range",
+    "pick_video_encoder",
+    "probe_media",
+    "probe_media_async",
+    "run_ffmpeg",
+    "select_codec",
+    "video_encoder_options",
+    "parse_scale_filter",
     "validate_range",
     "validate_file_path",
     "validate_filter_name",
@@ -36,4 +60,8 @@ __all__ = [
     "validate_output_path",
     "validate_video_paths",
     "COLOR_MAP",
+    "FILTER_NAMES",
+    "TRANSITION_TYPES",
+    "ANIMATION_TYPES",
+    "ENCODER_CODECS",
 ]
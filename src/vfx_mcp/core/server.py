@@ -17,10 +17,20 @@ Example:
 
         server = create_mcp_server()
         # Server is ready to handle MCP requests
+
+    Or serve over the transport selected by MCP_TRANSPORT ('stdio' or 'sse'):
+
+        $ MCP_TRANSPORT=sse MCP_PORT=8000 vfx-mcp
 """
 
+import os
+import sys
+from collections.abc import Callable
+
 from fastmcp import FastMCP
 
+from .utilities import pick_video_encoder
+
 
 def create_mcp_server() -> FastMCP[None]:
     """Create and configure the VFX MCP server with all tools registered.
@@ -38,6 +48,10 @@ def create_mcp_server() -> FastMCP[None]:
     """
     mcp: FastMCP[None] = FastMCP("vfx-mcp")
 
+    # Encoder detection runs ffmpeg synchronously; do it now rather than
+    # inside the first tool call on the event loop
+    pick_video_encoder()
+
     # Import and register all tool modules
     from ..resources.mcp_endpoints import register_resource_endpoints
     from ..tools.advanced_compositing import (
@@ -81,3 +95,42 @@ def create_mcp_server() -> FastMCP[None]:
     register_resource_endpoints(mcp)
 
     return mcp
+
+
+def _run_stdio(mcp: FastMCP[None]) -> None:
+    """Serve over stdin/stdout, as used by Claude Desktop."""
+    mcp.run()
+
+
+def _run_sse(mcp: FastMCP[None]) -> None:
+    """Serve over HTTP with server-sent events on MCP_HOST:MCP_PORT."""
+    mcp.run(
+        transport="sse",
+        host=os.environ.get("MCP_HOST", "127.0.0.1"),
+        port=int(os.environ.get("MCP_PORT", "8000")),
+    )
+
+
+_TRANSPORTS: dict[str, Callable[[FastMCP[None]], None]] = {
+    "stdio": _run_stdio,
+    "sse": _run_sse,
+}
+
+
+def main() -> None:
+    """Run the VFX MCP server on the transport named by MCP_TRANSPORT.
+
+    Defaults to stdio. The transport is validated before the server is built,
+    so an unknown value exits immediately without loading any tools.
+    """
+    transport = os.environ.get("MCP_TRANSPORT", "stdio")
+    run = _TRANSPORTS.get(transport)
+    if run is None:
+        print(
+            f"Unknown MCP_TRANSPORT {transport!r}; "
+            f"expected one of: {', '.join(_TRANSPORTS)}",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+    run(create_mcp_server())
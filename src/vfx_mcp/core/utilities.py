@@ -1,12 +1,23 @@
 """Common utilities and helper functions for VFX operations."""
 
+import asyncio
+import functools
+import os
+import re
+import subprocess
+import weakref
 from pathlib import Path
-from typing import TypedDict, NotRequired
+from typing import Any, TypedDict, NotRequired, cast
 from fractions import Fraction
 
 import ffmpeg
 from fastmcp import Context
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:  # orjson is an optional speedup
+    from json import loads as _json_loads
+
 
 async def handle_ffmpeg_error(e: ffmpeg.Error, ctx: Context | None = None) -> None:
     """Standard error handling for ffmpeg operations."""
@@ -30,6 +41,119 @@ async def handle_ffmpeg_error(e: ffmpeg.Error, ctx: Context | None = None) -> No
     raise RuntimeError(error_msg) from e
 
 
+# Enough of ffmpeg's stderr to diagnose a failure; progress spam before it is dropped.
+STDERR_TAIL_BYTES = 64 * 1024
+
+# Each ffmpeg process already spreads its encode across several cores, so
+# running more than about one per two cores only adds contention.
+MAX_CONCURRENT_FFMPEG = max(1, (os.cpu_count() or 2) // 2)
+
+# An asyncio.Semaphore binds to the first loop that waits on it, so each
+# running loop gets its own; entries go away with their loop.
+_ffmpeg_slots: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, asyncio.Semaphore
+] = weakref.WeakKeyDictionary()
+
+
+def _ffmpeg_slots_for_running_loop() -> asyncio.Semaphore:
+    """Return the ffmpeg concurrency semaphore for the running event loop."""
+    loop = asyncio.get_running_loop()
+    slots = _ffmpeg_slots.get(loop)
+    if slots is None:
+        slots = _ffmpeg_slots[loop] = asyncio.Semaphore(MAX_CONCURRENT_FFMPEG)
+    return slots
+
+
+# ffmpeg's banner line for an input's length, e.g. "Duration: 00:01:02.50"
+_DURATION_RE = re.compile(rb"Duration: (\d+):(\d{2}):(\d{2}(?:\.\d+)?)")
+
+
+async def run_ffmpeg(stream: ffmpeg.Stream, ctx: Context | None = None) -> None:
+    """Run an ffmpeg graph without blocking the event loop.
+
+    ffmpeg runs as an asyncio subprocess, so other MCP requests keep being
+    served while it encodes. Long encodes can write hundreds of megabytes of
+    progress output, so stderr is drained through a pipe (ffmpeg stalls if
+    it fills) and only the last STDERR_TAIL_BYTES are kept for the error
+    raised on failure. If the calling task is cancelled, ffmpeg is killed.
+
+    With a ctx, ffmpeg's -progress output is forwarded to the client through
+    ctx.report_progress as seconds of output written out of the input's
+    duration. Graphs with several inputs report no total, since the output
+    length depends on how the filters combine them.
+
+    At most MAX_CONCURRENT_FFMPEG processes run at once per event loop;
+    further calls wait for a free slot.
+
+    Raises:
+        ffmpeg.Error: If ffmpeg exits with a non-zero status.
+    """
+    args = ffmpeg.compile(stream, overwrite_output=True)
+    if ctx:
+        args[1:1] = ["-progress", "pipe:1", "-nostats"]
+    async with _ffmpeg_slots_for_running_loop():
+        proc = await asyncio.create_subprocess_exec(
+            *args,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE if ctx else asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        assert proc.stderr is not None
+        tail = bytearray()
+        try:
+            readers = [_drain_stderr(proc.stderr, tail)]
+            if ctx:
+                assert proc.stdout is not None
+                readers.append(
+                    _forward_progress(
+                        proc.stdout, tail, ctx, with_total=args.count("-i") == 1
+                    )
+                )
+            await asyncio.gather(*readers)
+            returncode = await proc.wait()
+        finally:
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+
+    if returncode:
+        raise ffmpeg.Error("ffmpeg", None, bytes(tail))
+
+
+async def _drain_stderr(stderr: asyncio.StreamReader, tail: bytearray) -> None:
+    """Read stderr to EOF, keeping only its last STDERR_TAIL_BYTES in tail."""
+    while chunk := await stderr.read(8192):
+        tail += chunk
+        del tail[:-STDERR_TAIL_BYTES]
+
+
+async def _forward_progress(
+    stdout: asyncio.StreamReader,
+    stderr_tail: bytearray,
+    ctx: Context,
+    with_total: bool = True,
+) -> None:
+    """Report each out_time_us line of ffmpeg's -progress output to ctx.
+
+    The total is the first input's duration from ffmpeg's banner, or None if
+    with_total is false.
+    """
+    total: float | None = None
+    while line := await stdout.readline():
+        key, _, value = line.strip().partition(b"=")
+        # out_time_us is "N/A" until the first frame is written
+        if key != b"out_time_us" or not value.isdigit():
+            continue
+        if (
+            with_total
+            and total is None
+            and (match := _DURATION_RE.search(stderr_tail))
+        ):
+            hours, minutes, seconds = match.groups()
+            total = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+        await ctx.report_progress(int(value) / 1_000_000, total)
+
+
 async def log_operation(ctx: Context | None, message: str) -> None:
     """Log operation info if context is available."""
     if ctx:
@@ -65,62 +189,257 @@ class VideoMetadata(TypedDict):
     audio: NotRequired[AudioStreamMetadata]
 
 
+def probe_media(path: str) -> dict[str, Any]:
+    """Run ffprobe on a media file and return its parsed JSON report.
+
+    Equivalent to ffmpeg.probe(), but parses the report with orjson when it
+    is installed and caches results per file version: a file is probed again
+    only after its size or modification time changes. The returned dict is
+    shared between callers and must not be mutated.
+
+    Raises:
+        ffmpeg.Error: If ffprobe exits with a non-zero status.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        # Not a local file (e.g. a URL) or missing: let ffprobe report it
+        return _run_ffprobe(path)
+    return _probe_file(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+async def probe_media_async(path: str) -> dict[str, Any]:
+    """Run probe_media() in a worker thread, keeping the event loop free.
+
+    Tools call this instead of probe_media() so that ffprobe's startup does
+    not stall other MCP requests.
+
+    Raises:
+        ffmpeg.Error: If ffprobe exits with a non-zero status.
+    """
+    return await asyncio.to_thread(probe_media, path)
+
+
+@functools.lru_cache(maxsize=256)
+def _probe_file(path: str, mtime_ns: int, size: int) -> dict[str, Any]:
+    """Probe a local file; mtime_ns and size only key the cache."""
+    return _run_ffprobe(path)
+
+
+def _run_ffprobe(path: str) -> dict[str, Any]:
+    """Run ffprobe and parse its JSON report."""
+    result = subprocess.run(
+        ["ffprobe", "-show_format", "-show_streams", "-of", "json", path],
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+    )
+    if result.returncode:
+        raise ffmpeg.Error("ffprobe", result.stdout, result.stderr)
+    return cast(dict[str, Any], _json_loads(result.stdout))
+
+
+async def get_stream_codecs(path: str) -> tuple[str | None, str | None]:
+    """Return the (video, audio) codec names of a media file's first streams.
+
+    Either entry is None when the file has no stream of that type.
+
+    Raises:
+        ffmpeg.Error: If ffprobe cannot read the file.
+    """
+    codecs: dict[str, str] = {}
+    for stream in (await probe_media_async(path)).get("streams", []):
+        codecs.setdefault(stream.get("codec_type", ""), stream.get("codec_name", ""))
+    return codecs.get("video"), codecs.get("audio")
+
+
+# Codec that ffprobe reports for the output of each encoder the tools select.
+ENCODER_CODECS = {
+    "libx264": "h264",
+    "h264_nvenc": "h264",
+    "h264_qsv": "h264",
+    "h264_videotoolbox": "h264",
+    "h264_amf": "h264",
+    "libx265": "hevc",
+    "libvpx": "vp8",
+    "libvpx-vp9": "vp9",
+    "libaom-av1": "av1",
+    "aac": "aac",
+    "libmp3lame": "mp3",
+    "libvorbis": "vorbis",
+    "libopus": "opus",
+}
+
+
+def select_codec(encoder: str, source_codec: str | None) -> str:
+    """Return "copy" if encoding with encoder would reproduce source_codec.
+
+    Re-encoding a stream into the codec it already uses only costs time and
+    quality, so callers stream-copy it instead.
+    """
+    if source_codec and ENCODER_CODECS.get(encoder, encoder) == source_codec:
+        return "copy"
+    return encoder
+
+
+# Hardware H.264 encoders, most preferred first. VAAPI is left out because
+# it needs an explicit device and hwupload filter in the graph.
+HW_H264_ENCODERS = ("h264_nvenc", "h264_qsv", "h264_videotoolbox", "h264_amf")
+
+# Constant-quality settings roughly matching libx264's default CRF 23. Left
+# to their own defaults, hardware encoders fall back to low fixed bitrates.
+HW_H264_QUALITY: dict[str, dict[str, str | int]] = {
+    "h264_nvenc": {"rc": "vbr", "cq": 23, "b:v": 0},
+    "h264_qsv": {"global_quality": 23},
+    "h264_videotoolbox": {"q:v": 65},
+    "h264_amf": {"rc": "cqp", "qp_i": 23, "qp_p": 23, "qp_b": 23},
+}
+
+
+@functools.cache
+def pick_video_encoder() -> str:
+    """Return the H.264 encoder to use by default on this host.
+
+    libx264 unless VFX_MCP_HW_ENCODE=1, in which case the first working
+    hardware encoder is preferred. ffmpeg builds often list hardware encoders
+    for devices that are not present, so each listed candidate is verified
+    with a tiny test encode before it is chosen. This runs ffmpeg
+    synchronously, so create_mcp_server() resolves it before serving; the
+    result is cached for the life of the process.
+    """
+    if os.environ.get("VFX_MCP_HW_ENCODE", "0") != "1":
+        return "libx264"
+    try:
+        listing = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-encoders"],
+            stdin=subprocess.DEVNULL,
+            capture_output=True,
+            text=True,
+        ).stdout
+    except OSError:
+        return "libx264"
+    for encoder in HW_H264_ENCODERS:
+        if f" {encoder} " in listing and _encoder_works(encoder):
+            return encoder
+    return "libx264"
+
+
+def video_encoder_options(encoder: str | None = None) -> dict[str, str | int]:
+    """Return ffmpeg.output() options for encoding video with encoder.
+
+    Defaults to pick_video_encoder(). Hardware encoders get the constant-
+    quality settings from HW_H264_QUALITY so their output is comparable to
+    libx264's.
+    """
+    encoder = encoder or pick_video_encoder()
+    return {"vcodec": encoder, **HW_H264_QUALITY.get(encoder, {})}
+
+
+def hw_decode_options() -> dict[str, str]:
+    """Return ffmpeg.input() options that offload decoding to the GPU.
+
+    Only enabled when pick_video_encoder() found a working hardware encoder,
+    so software-only hosts run exactly the same commands as before. ffmpeg
+    copies decoded frames back to system memory for the software filters.
+    """
+    return {} if pick_video_encoder() == "libx264" else {"hwaccel": "auto"}
+
+
+def _encoder_works(encoder: str) -> bool:
+    """Check that encoder can open and encode a frame, not just that it is built in."""
+    try:
+        result = subprocess.run(
+            [
+                "ffmpeg", "-hide_banner", "-loglevel", "error",
+                "-f", "lavfi", "-i", "color=size=256x256:duration=0.1",
+                "-frames:v", "1", "-c:v", encoder, "-pix_fmt", "yuv420p",
+                "-f", "null", "-",
+            ],
+            stdin=subprocess.DEVNULL,
+            capture_output=True,
+            timeout=30,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return result.returncode == 0
+
+
 def get_video_metadata(
     video_path: str,
 ) -> VideoMetadata:
     """Extract comprehensive video metadata using ffmpeg probe."""
     try:
-        probe = ffmpeg.probe(video_path)
-        format_info = probe.get("format", {})
-
-        # Find video and audio streams
-        video_stream = next(
-            (s for s in probe["streams"] if s.get("codec_type") == "video"),
-            None,
-        )
-        audio_stream = next(
-            (s for s in probe["streams"] if s.get("codec_type") == "audio"),
-            None,
-        )
+        return _video_metadata(probe_media(video_path))
+    except ffmpeg.Error as e:
+        raise RuntimeError(f"Error analyzing video: {e}") from e
 
-        metadata: VideoMetadata = {
-            "filename": Path(format_info.get("filename", "")).name,
-            "format": format_info.get("format_name", ""),
-            "duration": float(format_info.get("duration", 0)),
-            "size": int(format_info.get("size", 0)),
-            "bitrate": int(format_info.get("bit_rate", 0)),
-        }
 
-        if video_stream:
-            video_meta: VideoStreamMetadata = {
-                "codec": video_stream.get("codec_name", ""),
-                "width": int(video_stream.get("width", 0)),
-                "height": int(video_stream.get("height", 0)),
-                "fps": _parse_frame_rate(video_stream.get("r_frame_rate", "0/1")),
-                "aspect_ratio": video_stream.get("display_aspect_ratio", ""),
-                "pixel_format": video_stream.get("pix_fmt", ""),
-            }
-            metadata["video"] = video_meta
-
-        if audio_stream:
-            audio_meta: AudioStreamMetadata = {
-                "codec": audio_stream.get("codec_name", ""),
-                "channels": int(audio_stream.get("channels", 0)),
-                "sample_rate": int(audio_stream.get("sample_rate", 0)),
-                "bitrate": int(audio_stream.get("bit_rate", 0)),
-            }
-            metadata["audio"] = audio_meta
-
-        return metadata
+async def get_video_metadata_async(video_path: str) -> VideoMetadata:
+    """Like get_video_metadata(), but probes in a worker thread.
 
+    Raises:
+        RuntimeError: If ffprobe cannot read the file.
+    """
+    try:
+        return _video_metadata(await probe_media_async(video_path))
     except ffmpeg.Error as e:
         raise RuntimeError(f"Error analyzing video: {e}") from e
 
 
+def _video_metadata(probe: dict[str, Any]) -> VideoMetadata:
+    """Summarise an ffprobe report as VideoMetadata."""
+    format_info = probe.get("format", {})
+
+    # Find video and audio streams
+    video_stream = next(
+        (s for s in probe["streams"] if s.get("codec_type") == "video"),
+        None,
+    )
+    audio_stream = next(
+        (s for s in probe["streams"] if s.get("codec_type") == "audio"),
+        None,
+    )
+
+    metadata: VideoMetadata = {
+        "filename": Path(format_info.get("filename", "")).name,
+        "format": format_info.get("format_name", ""),
+        "duration": float(format_info.get("duration", 0)),
+        "size": int(format_info.get("size", 0)),
+        "bitrate": int(format_info.get("bit_rate", 0)),
+    }
+
+    if video_stream:
+        video_meta: VideoStreamMetadata = {
+            "codec": video_stream.get("codec_name", ""),
+            "width": int(video_stream.get("width", 0)),
+            "height": int(video_stream.get("height", 0)),
+            "fps": _parse_frame_rate(video_stream.get("r_frame_rate", "0/1")),
+            "aspect_ratio": video_stream.get("display_aspect_ratio", ""),
+            "pixel_format": video_stream.get("pix_fmt", ""),
+        }
+        metadata["video"] = video_meta
+
+    if audio_stream:
+        audio_meta: AudioStreamMetadata = {
+            "codec": audio_stream.get("codec_name", ""),
+            "channels": int(audio_stream.get("channels", 0)),
+            "sample_rate": int(audio_stream.get("sample_rate", 0)),
+            "bitrate": int(audio_stream.get("bit_rate", 0)),
+        }
+        metadata["audio"] = audio_meta
+
+    return metadata
+
+
 def create_standard_output(stream: ffmpeg.Stream, output_path: str, **kwargs: str | int | float) -> ffmpeg.Stream:
-    """Create ffmpeg output with standard encoding settings."""
+    """Create ffmpeg output with standard encoding settings.
+
+    Video is encoded to H.264 with pick_video_encoder() unless a vcodec is
+    given. Hardware encoders get the quality settings from HW_H264_QUALITY;
+    any of them can be overridden through kwargs.
+    """
+    vcodec = kwargs.get("vcodec")
     default_settings: dict[str, str | int | float] = {
-        "vcodec": "libx264",
+        **video_encoder_options(str(vcodec) if vcodec else None),
         "acodec": "aac",
         "pix_fmt": "yuv420p",
     }
@@ -146,16 +465,22 @@ COLOR_MAP = {
 }
 
 
+_HEX_COLOR_RE = re.compile(r"(?:#|0x)([0-9a-fA-F]{6}(?:[0-9a-fA-F]{2})?)")
+
+
 def parse_color(color: str) -> str:
-    """Parse color name or hex code to ffmpeg-compatible format."""
-    if color.lower() in COLOR_MAP:
-        return COLOR_MAP[color.lower()]
-    elif color.startswith("#"):
-        return "0x" + color[1:]
-    elif color.startswith("0x"):
-        return color
-    else:
+    """Parse color name or hex code to ffmpeg-compatible format.
+
+    Accepts a name from COLOR_MAP, or "#RRGGBB" / "0xRRGGBB" with an
+    optional alpha byte.
+    """
+    named = COLOR_MAP.get(color.lower())
+    if named:
+        return named
+    match = _HEX_COLOR_RE.fullmatch(color)
+    if not match:
         raise ValueError(f"Invalid color format: {color}")
+    return "0x" + match[1]
 
 
 def parse_resolution(
@@ -187,9 +512,6 @@ def parse_size_range(
 def _parse_frame_rate(frame_rate: str) -> float:
     """Parse frame rate string (e.g., '30/1' or '30000/1001') to float."""
     try:
-        if "/" in frame_rate:
-            numerator, denominator = frame_rate.split("/")
-            return float(Fraction(int(numerator), int(denominator)))
-        return float(frame_rate)
+        return float(Fraction(frame_rate))
     except (ValueError, ZeroDivisionError):
         return 0.0
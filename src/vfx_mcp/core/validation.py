@@ -1,7 +1,53 @@
 """Parameter validation functions for VFX operations."""
 
+import functools
+import re
 from pathlib import Path
 
+FILTER_NAMES = frozenset(
+    {
+        "blur",
+        "sharpen",
+        "brightness",
+        "contrast",
+        "saturation",
+        "vintage",
+        "sepia",
+        "grayscale",
+        "hflip",
+    }
+)
+
+TRANSITION_TYPES = frozenset(
+    {
+        "fade",
+        "wipe_left",
+        "wipe_right",
+        "wipe_up",
+        "wipe_down",
+        "slide_left",
+        "slide_right",
+        "dissolve",
+        "crossfade",
+    }
+)
+
+ANIMATION_TYPES = frozenset(
+    {
+        "fade_in",
+        "slide_in_left",
+        "slide_in_right",
+        "slide_in_top",
+        "slide_in_bottom",
+        "zoom_in",
+        "rotate_in",
+        "typewriter",
+    }
+)
+
+# -1 and -2 let ffmpeg derive a side from the aspect ratio (-2 keeps it even)
+_SCALE_FILTER_RE = re.compile(r"scale=(-[12]|\d{1,5})[x:](-[12]|\d{1,5})")
+
 
 def validate_range(
     value: float,
@@ -51,63 +97,47 @@ def validate_transition_type(
     transition_type: str,
 ) -> str:
     """Validate transition type parameter."""
-    valid_transitions = [
-        "fade",
-        "wipe_left",
-        "wipe_right",
-        "wipe_up",
-        "wipe_down",
-        "slide_left",
-        "slide_right",
-        "dissolve",
-        "crossfade",
-    ]
-    if transition_type not in valid_transitions:
+    if transition_type not in TRANSITION_TYPES:
         raise ValueError(
-            f"Transition type must be one of: {', '.join(valid_transitions)}"
+            f"Transition type must be one of: {', '.join(sorted(TRANSITION_TYPES))}"
         )
     return transition_type
 
 
 def validate_filter_name(filter_name: str) -> str:
     """Validate video filter name."""
-    common_filters = [
-        "blur",
-        "sharpen",
-        "brightness",
-        "contrast",
-        "saturation",
-        "vintage",
-        "sepia",
-        "grayscale",
-        "hflip",
-    ]
-    # Allow scale filters with parameters
     if filter_name.startswith("scale="):
+        parse_scale_filter(filter_name)
         return filter_name
-    if filter_name not in common_filters:
+    if filter_name not in FILTER_NAMES:
         raise ValueError(
-            f"Filter must be one of: {', '.join(common_filters)} or scale=WIDTHxHEIGHT"
+            f"Filter must be one of: {', '.join(sorted(FILTER_NAMES))} "
+            "or scale=WIDTHxHEIGHT"
         )
     return filter_name
 
 
+@functools.lru_cache(maxsize=64)
+def parse_scale_filter(filter_name: str) -> tuple[int, int]:
+    """Parse a "scale=WIDTHxHEIGHT" (or "scale=WIDTH:HEIGHT") filter name.
+
+    Either side may be -1 or -2 to keep the aspect ratio.
+    """
+    match = _SCALE_FILTER_RE.fullmatch(filter_name)
+    if not match:
+        raise ValueError("Scale filter must be in format 'scale=WIDTHxHEIGHT'")
+    width, height = int(match[1]), int(match[2])
+    if not width or not height:
+        raise ValueError("Scale dimensions must be positive")
+    return width, height
+
+
 def validate_animation_type(
     animation_type: str,
 ) -> str:
     """Validate text animation type."""
-    valid_animations = [
-        "fade_in",
-        "slide_in_left",
-        "slide_in_right",
-        "slide_in_top",
-        "slide_in_bottom",
-        "zoom_in",
-        "rotate_in",
-        "typewriter",
-    ]
-    if animation_type not in valid_animations:
+    if animation_type not in ANIMATION_TYPES:
         raise ValueError(
-            f"Animation type must be one of: {', '.join(valid_animations)}"
+            f"Animation type must be one of: {', '.join(sorted(ANIMATION_TYPES))}"
         )
     return animation_type
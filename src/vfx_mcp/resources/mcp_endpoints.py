@@ -1,11 +1,83 @@
 """MCP resource endpoints for tool discovery and video metadata."""
 
+import hashlib
 import json
 from pathlib import Path
 
 from fastmcp import FastMCP
 
-from ..core import get_video_metadata
+from ..core import get_video_metadata_async
+
+try:
+    import orjson
+
+    def _dumps(obj: object) -> str:
+        """Serialize obj to indented JSON using orjson."""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+except ImportError:  # orjson is an optional speedup
+
+    def _dumps(obj: object) -> str:
+        """Serialize obj to indented JSON using the standard library."""
+        return json.dumps(obj, indent=2)
+
+
+_ADVANCED_TOOLS: list[dict[str, str | list[str]]] = [
+    {
+        "name": "create_video_slideshow",
+        "purpose": "Create slideshow videos from image sequences",
+        "key_features": [
+            "Customizable transition effects",
+            "Audio track synchronization",
+            "Variable image duration timing",
+            "Ken Burns pan/zoom effects",
+        ],
+        "example_use": "Transform photo albums into dynamic video "
+        "presentations",
+    },
+    {
+        "name": "create_green_screen_effect",
+        "purpose": "Remove green/blue screen and replace with custom "
+        "backgrounds",
+        "key_features": [
+            "Advanced chroma key compositing",
+            "Adjustable similarity and blend parameters",
+            "Color spill reduction",
+            "Support for multiple key colors",
+        ],
+        "example_use": "Create professional composited videos with "
+        "custom backgrounds",
+    },
+    # Add more tools as needed
+]
+
+# The catalog is static, so serialize it once at import instead of per request.
+_ADVANCED_TOOLS_CATALOG = {
+    "advanced_tools": _ADVANCED_TOOLS,
+    "total_tools": len(_ADVANCED_TOOLS),
+    "categories": [
+        "compositing",
+        "effects",
+        "analysis",
+        "automation",
+    ],
+}
+# Version token for the catalog; clients that already hold it can ask for a
+# conditional read and get a tiny "unchanged" reply instead of the full body.
+_ADVANCED_TOOLS_ETAG = hashlib.blake2b(
+    _dumps(_ADVANCED_TOOLS_CATALOG).encode(),
+    digest_size=16,
+).hexdigest()
+_ADVANCED_TOOLS_JSON = _dumps(
+    {**_ADVANCED_TOOLS_CATALOG, "etag": _ADVANCED_TOOLS_ETAG}
+)
+_ADVANCED_TOOLS_UNCHANGED_JSON = _dumps(
+    {"unchanged": True, "etag": _ADVANCED_TOOLS_ETAG}
+)
+
+VIDEO_EXTENSIONS = frozenset(
+    {".mp4", ".avi", ".mov", ".mkv", ".wmv", ".flv", ".webm"}
+)
 
 
 def register_resource_endpoints(
@@ -16,15 +88,6 @@ def register_resource_endpoints(
     @mcp.resource("videos://list")
     async def list_videos_resource() -> str:
         """List available video files in common directories."""
-        video_extensions = {
-            ".mp4",
-            ".avi",
-            ".mov",
-            ".mkv",
-            ".wmv",
-            ".flv",
-            ".webm",
-        }
         video_files: list[str] = []
 
         # Search common video directories
@@ -38,18 +101,18 @@ def register_resource_endpoints(
         for search_path in search_paths:
             if search_path.exists():
                 for file_path in search_path.rglob("*"):
+                    # Suffix first: it is a string check, is_file() is a stat call
                     if (
-                        file_path.is_file()
-                        and file_path.suffix.lower() in video_extensions
+                        file_path.suffix.lower() in VIDEO_EXTENSIONS
+                        and file_path.is_file()
                     ):
                         video_files.append(file_path.name)
 
-        return json.dumps(
+        return _dumps(
             {
                 "videos": video_files[:100],  # Limit to first 100 files
                 "total_found": len(video_files),
-            },
-            indent=2,
+            }
         )
 
     # Ensure function is registered with MCP
@@ -59,10 +122,10 @@ def register_resource_endpoints(
     async def video_metadata_resource(filename: str) -> str:
         """Get detailed metadata for a specific video file."""
         try:
-            metadata = get_video_metadata(filename)
-            return json.dumps(metadata, indent=2)
+            metadata = await get_video_metadata_async(filename)
+            return _dumps(metadata)
         except Exception as e:
-            return json.dumps({"error": str(e)}, indent=2)
+            return _dumps({"error": str(e)})
 
     # Ensure function is registered with MCP
     del video_metadata_resource
@@ -70,48 +133,20 @@ def register_resource_endpoints(
     @mcp.resource("tools://advanced/{category}")
     async def advanced_tools_resource(category: str = "all") -> str:
         """List advanced VFX tools with descriptions and capabilities."""
-        advanced_tools = [
-            {
-                "name": "create_video_slideshow",
-                "purpose": "Create slideshow videos from image sequences",
-                "key_features": [
-                    "Customizable transition effects",
-                    "Audio track synchronization",
-                    "Variable image duration timing",
-                    "Ken Burns pan/zoom effects",
-                ],
-                "example_use": "Transform photo albums into dynamic video "
-                "presentations",
-            },
-            {
-                "name": "create_green_screen_effect",
-                "purpose": "Remove green/blue screen and replace with custom "
-                "backgrounds",
-                "key_features": [
-                    "Advanced chroma key compositing",
-                    "Adjustable similarity and blend parameters",
-                    "Color spill reduction",
-                    "Support for multiple key colors",
-                ],
-                "example_use": "Create professional composited videos with "
-                "custom backgrounds",
-            },
-            # Add more tools as needed
-        ]
-
-        return json.dumps(
-            {
-                "advanced_tools": advanced_tools,
-                "total_tools": len(advanced_tools),
-                "categories": [
-                    "compositing",
-                    "effects",
-                    "analysis",
-                    "automation",
-                ],
-            },
-            indent=2,
-        )
+        return _ADVANCED_TOOLS_JSON
 
     # Ensure function is registered with MCP
     del advanced_tools_resource
+
+    @mcp.resource("tools://advanced/{category}/{if_none_match}")
+    async def advanced_tools_conditional_resource(
+        category: str,
+        if_none_match: str,
+    ) -> str:
+        """List advanced VFX tools unless the client's etag is still current."""
+        if if_none_match == _ADVANCED_TOOLS_ETAG:
+            return _ADVANCED_TOOLS_UNCHANGED_JSON
+        return _ADVANCED_TOOLS_JSON
+
+    # Ensure function is registered with MCP
+    del advanced_tools_conditional_resource
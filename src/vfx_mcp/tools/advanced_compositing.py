@@ -1,18 +1,29 @@
 """Advanced compositing tools: green screen, motion blur, and complex effects."""
 
+from pathlib import Path
+
 import ffmpeg
 from fastmcp import Context, FastMCP
 
 from ..core import (
     create_standard_output,
+    get_video_metadata_async,
     handle_ffmpeg_error,
+    hw_decode_options,
     log_operation,
     parse_color,
+    run_ffmpeg,
     validate_range,
+    video_encoder_options,
 )
 
 __all__ = ["register_compositing_tools"]
 
+# Background files treated as still images rather than videos
+IMAGE_EXTENSIONS = frozenset(
+    {".png", ".jpg", ".jpeg", ".bmp", ".webp", ".tif", ".tiff"}
+)
+
 
 def register_compositing_tools(
     mcp: FastMCP[None],
@@ -39,7 +50,8 @@ def register_compositing_tools(
             input_path: Path to the input video with green/blue screen.
             output_path: Path where the composited video will be saved.
             background_path: Path to background image/video. If None, creates
-                transparent background.
+                transparent background. A still image is repeated for the
+                whole input video.
             chroma_key_color: Color to remove ("green", "blue", "red", or hex code
                 like "#00FF00").
             similarity: Color similarity threshold (0.0 to 1.0). Lower = more precise.
@@ -73,7 +85,9 @@ def register_compositing_tools(
         )
 
         try:
-            input_stream: ffmpeg.Stream = ffmpeg.input(input_path)
+            input_stream: ffmpeg.Stream = ffmpeg.input(
+                input_path, **hw_decode_options()
+            )
 
             # Create chromakey filter
             keyed: ffmpeg.Stream = ffmpeg.filter(
@@ -96,12 +110,29 @@ def register_compositing_tools(
             output_stream: ffmpeg.Stream
             if background_path:
                 # Composite with background
-                background: ffmpeg.Stream = ffmpeg.input(background_path)
+                background: ffmpeg.Stream
+                overlay_kwargs: dict[str, int] = {}
+                if Path(background_path).suffix.lower() in IMAGE_EXTENSIONS:
+                    # Decode a still once and repeat it in memory at the
+                    # foreground's frame rate, instead of re-reading it per frame
+                    metadata = await get_video_metadata_async(input_path)
+                    fps = metadata.get("video", {}).get("fps")
+                    background = ffmpeg.filter(
+                        ffmpeg.input(background_path, framerate=fps or 25),
+                        "loop",
+                        loop=-1,
+                        size=1,
+                    )
+                    # The looped still never ends; stop with the foreground
+                    overlay_kwargs["shortest"] = 1
+                else:
+                    background = ffmpeg.input(background_path)
                 output_stream = ffmpeg.filter(
                     [background, keyed],
                     "overlay",
                     x="(W-w)/2",
                     y="(H-h)/2",
+                    **overlay_kwargs,
                 )
             else:
                 # Transparent background
@@ -110,10 +141,10 @@ def register_compositing_tools(
             output: ffmpeg.Stream = ffmpeg.output(
                 output_stream,
                 output_path,
-                vcodec="libx264",
+                **video_encoder_options(),
                 pix_fmt="yuv420p",
             )
-            ffmpeg.run(output, overwrite_output=True)
+            await run_ffmpeg(output, ctx)
 
             bg_msg = (
                 " with custom background"
@@ -166,47 +197,21 @@ def register_compositing_tools(
             f"Applying motion blur (strength: {blur_strength}, angle: {angle}°)...",
         )
 
-        try:
-            stream: ffmpeg.Stream = ffmpeg.input(input_path)
-
-            # Convert angle and strength to blur parameters
-            blur_amount = int(blur_strength * 3) * 2 + 1  # Odd number for kernel size
-
-            # Create motion blur kernel based on angle
-            # Note: Complex motion blur math would go here in a real implementation
+        # Blur radius in pixels along the direction of motion
+        blur_radius = int(blur_strength * 3) * 2 + 1
 
-            # For simplicity, use mblur filter with approximated settings
-            if angle < 45 or angle > 315:
-                # Horizontal blur
-                stream = ffmpeg.filter(
-                    stream,
-                    "boxblur",
-                    luma_radius=f"{blur_amount}:1",
-                )
-            elif 45 <= angle < 135:
-                # Vertical blur
-                stream = ffmpeg.filter(
-                    stream,
-                    "boxblur",
-                    luma_radius=f"1:{blur_amount}",
-                )
-            elif 135 <= angle < 225:
-                # Horizontal blur (reverse)
-                stream = ffmpeg.filter(
-                    stream,
-                    "boxblur",
-                    luma_radius=f"{blur_amount}:1",
-                )
-            else:
-                # Vertical blur (reverse)
-                stream = ffmpeg.filter(
-                    stream,
-                    "boxblur",
-                    luma_radius=f"1:{blur_amount}",
-                )
+        try:
+            stream: ffmpeg.Stream = ffmpeg.input(input_path, **hw_decode_options())
+            # Directional IIR blur: constant cost per pixel at any radius
+            stream = ffmpeg.filter(
+                stream,
+                "dblur",
+                angle=angle,
+                radius=blur_radius,
+            )
 
             output: ffmpeg.Stream = create_standard_output(stream, output_path)
-            ffmpeg.run(output, overwrite_output=True)
+            await run_ffmpeg(output, ctx)
 
             return (
                 f"Motion blur applied (strength: {blur_strength}, angle: {angle}°) "
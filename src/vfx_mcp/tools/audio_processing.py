@@ -21,17 +21,33 @@ Example:
         )
 """
 
+from pathlib import Path
 from typing import Any
 
 import ffmpeg
 from fastmcp import Context, FastMCP
 
 from ..core import (
+    get_stream_codecs,
     handle_ffmpeg_error,
     log_operation,
+    run_ffmpeg,
+    select_codec,
     validate_range,
 )
 
+# Containers that accept a stream-copied AAC track.
+AAC_COPY_CONTAINERS = frozenset({".mp4", ".m4v", ".mov", ".mkv"})
+
+# Audio encoder used for each extract_audio output format.
+AUDIO_FORMAT_CODECS = {
+    "mp3": "libmp3lame",
+    "wav": "pcm_s16le",
+    "aac": "aac",
+    "flac": "flac",
+    "ogg": "libvorbis",
+}
+
 
 def register_audio_tools(mcp: FastMCP[Any]) -> None:
     """Register audio processing tools with the MCP server.
@@ -92,15 +108,10 @@ def register_audio_tools(mcp: FastMCP[Any]) -> None:
                     bitrate="320k"
                 )
         """
-        supported_formats = [
-            "mp3",
-            "wav",
-            "aac",
-            "flac",
-            "ogg",
-        ]
-        if format not in supported_formats:
-            raise ValueError(f"Format must be one of: {', '.join(supported_formats)}")
+        if format not in AUDIO_FORMAT_CODECS:
+            raise ValueError(
+                f"Format must be one of: {', '.join(AUDIO_FORMAT_CODECS)}"
+            )
 
         await log_operation(
             ctx,
@@ -117,18 +128,11 @@ def register_audio_tools(mcp: FastMCP[Any]) -> None:
                 output: Any = ffmpeg.output(
                     audio_stream,
                     output_path,
-                    acodec="pcm_s16le",
+                    acodec=AUDIO_FORMAT_CODECS["wav"],
                 )
             else:
-                codec_map = {
-                    "mp3": "libmp3lame",
-                    "aac": "aac",
-                    "flac": "flac",
-                    "ogg": "libvorbis",
-                }
-
                 output_kwargs: dict[str, Any] = {
-                    "acodec": codec_map[format],
+                    "acodec": AUDIO_FORMAT_CODECS[format],
                 }
 
                 # Handle bitrate differently for different formats
@@ -157,7 +161,7 @@ def register_audio_tools(mcp: FastMCP[Any]) -> None:
                     **output_kwargs,
                 )
 
-            ffmpeg.run(output, overwrite_output=True)
+            await run_ffmpeg(output, ctx)
             return f"Audio extracted successfully and saved to {output_path}"
         except ffmpeg.Error as e:
             await handle_ffmpeg_error(e, ctx)
@@ -175,7 +179,8 @@ def register_audio_tools(mcp: FastMCP[Any]) -> None:
         """Add or replace audio in a video file.
 
         Combines a video file with an audio file. Can either replace the existing
-        audio track or mix the new audio with the existing audio.
+        audio track or mix the new audio with the existing audio. When replacing
+        with an AAC track at unchanged volume, the audio is stream-copied.
 
         Args:
             input_path: Path to the input video file.
@@ -206,18 +211,24 @@ def register_audio_tools(mcp: FastMCP[Any]) -> None:
 
             if replace:
                 # Replace existing audio
+                audio_codec = "aac"
                 if audio_volume != 1.0:
                     audio_input = ffmpeg.filter(
                         audio_input,
                         "volume",
                         audio_volume,
                     )
+                elif Path(output_path).suffix.lower() in AAC_COPY_CONTAINERS:
+                    # Untouched AAC can go into the container as-is
+                    audio_codec = select_codec(
+                        audio_codec, (await get_stream_codecs(audio_path))[1]
+                    )
                 output: Any = ffmpeg.output(
                     video_input,
                     audio_input,
                     output_path,
                     vcodec="copy",
-                    acodec="aac",
+                    acodec=audio_codec,
                     shortest=None,
                 )
             else:  # mix
@@ -243,7 +254,7 @@ def register_audio_tools(mcp: FastMCP[Any]) -> None:
                     acodec="aac",
                 )
 
-            ffmpeg.run(output, overwrite_output=True)
+            await run_ffmpeg(output, ctx)
             return f"Audio {mode}d successfully and saved to {output_path}"
         except ffmpeg.Error as e:
             await handle_ffmpeg_error(e, ctx)
@@ -285,7 +296,7 @@ def register_audio_tools(mcp: FastMCP[Any]) -> None:
             stream: Any = ffmpeg.input(input_path)
             stream = ffmpeg.filter(stream, "volume", volume)
             output: Any = ffmpeg.output(stream, output_path)
-            ffmpeg.run(output, overwrite_output=True)
+            await run_ffmpeg(output, ctx)
             return f"Audio volume adjusted to {volume}x and saved to {output_path}"
         except ffmpeg.Error as e:
             await handle_ffmpeg_error(e, ctx)
@@ -346,7 +357,7 @@ def register_audio_tools(mcp: FastMCP[Any]) -> None:
                 duration="longest",
             )
             output: Any = ffmpeg.output(mixed_audio, output_path)
-            ffmpeg.run(output, overwrite_output=True)
+            await run_ffmpeg(output, ctx)
             return f"Audio files mixed successfully and saved to {output_path}"
         except ffmpeg.Error as e:
             await handle_ffmpeg_error(e, ctx)
@@ -388,7 +399,7 @@ def register_audio_tools(mcp: FastMCP[Any]) -> None:
             stream: Any = ffmpeg.input(input_path)
             stream = ffmpeg.filter(stream, "afade", type="in", duration=duration)
             output: Any = ffmpeg.output(stream, output_path)
-            ffmpeg.run(output, overwrite_output=True)
+            await run_ffmpeg(output, ctx)
             return f"Fade-in effect applied ({duration}s) and saved to {output_path}"
         except ffmpeg.Error as e:
             await handle_ffmpeg_error(e, ctx)
@@ -430,7 +441,7 @@ def register_audio_tools(mcp: FastMCP[Any]) -> None:
             stream: Any = ffmpeg.input(input_path)
             stream = ffmpeg.filter(stream, "afade", type="out", duration=duration)
             output: Any = ffmpeg.output(stream, output_path)
-            ffmpeg.run(output, overwrite_output=True)
+            await run_ffmpeg(output, ctx)
             return f"Fade-out effect applied ({duration}s) and saved to {output_path}"
         except ffmpeg.Error as e:
             await handle_ffmpeg_error(e, ctx)
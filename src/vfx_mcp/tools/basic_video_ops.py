@@ -11,19 +11,98 @@ Example:
         register_basic_video_tools(mcp)
 """
 
+import asyncio
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
 
 import ffmpeg
 from fastmcp import Context, FastMCP
 
 from ..core import (
     create_standard_output,
-    get_video_metadata,
+    get_video_metadata_async,
     handle_ffmpeg_error,
+    hw_decode_options,
     log_operation,
+    probe_media_async,
+    run_ffmpeg,
     validate_range,
 )
 from ..core.utilities import VideoMetadata
 
+# Containers whose index (moov atom) can be moved to the front of the file
+FASTSTART_SUFFIXES = frozenset({".mp4", ".m4v", ".mov"})
+
+# Stream parameters that must agree for the concat demuxer to copy streams.
+# The output keeps only the first input's codec headers (profile, level,
+# extradata), so those must match too; extradata_size is only reported by
+# newer ffprobe builds and is None for both sides otherwise.
+CONCAT_COPY_KEYS = (
+    "codec_type",
+    "codec_name",
+    "profile",
+    "level",
+    "extradata_size",
+    "width",
+    "height",
+    "pix_fmt",
+    "r_frame_rate",
+    "time_base",
+    "sample_rate",
+    "sample_fmt",
+    "channels",
+    "channel_layout",
+)
+
+
+async def _concat_signature(path: str) -> tuple[Any, ...]:
+    """Describe a file's audio/video streams for concat-compatibility checks."""
+    probe = await probe_media_async(path)
+    return tuple(
+        tuple(stream.get(key) for key in CONCAT_COPY_KEYS)
+        for stream in probe.get("streams", [])
+        if stream.get("codec_type") in ("video", "audio")
+    )
+
+
+async def _can_concat_copy(input_paths: list[str], output_path: str) -> bool:
+    """Check whether inputs can be joined by the concat demuxer without re-encoding.
+
+    Every input must share the output's container and have identical stream
+    parameters; otherwise the joined file would be unplayable.
+    """
+    suffix = Path(output_path).suffix.lower()
+    if any(Path(path).suffix.lower() != suffix for path in input_paths):
+        return False
+    # Probe all inputs at once rather than paying ffprobe's startup N times
+    first, *rest = await asyncio.gather(*map(_concat_signature, input_paths))
+    return bool(first) and all(signature == first for signature in rest)
+
+
+async def _concat_copy(
+    input_paths: list[str], output_path: str, ctx: Context | None = None
+) -> None:
+    """Join compatible inputs with the concat demuxer, copying all streams."""
+    # A private list file per call, so concurrent calls cannot collide
+    fd, list_path = tempfile.mkstemp(suffix=".txt", text=True)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as list_file:
+            # Quotes in a path close the quoted string: escape them as '\''
+            escaped = (
+                os.path.abspath(path).replace("'", "'\\''") for path in input_paths
+            )
+            list_file.write("".join(f"file '{path}'\n" for path in escaped))
+        stream = ffmpeg.input(list_path, f="concat", safe=0)
+        output_kwargs: dict[str, str] = {"c": "copy"}
+        if Path(output_path).suffix.lower() in FASTSTART_SUFFIXES:
+            # Index up front so players can start before the whole file arrives
+            output_kwargs["movflags"] = "+faststart"
+        await run_ffmpeg(ffmpeg.output(stream, output_path, **output_kwargs), ctx)
+    finally:
+        os.unlink(list_path)
+
 
 def register_basic_video_tools(
     mcp: FastMCP[object],
@@ -86,7 +165,7 @@ def register_basic_video_tools(
             else:
                 stream = ffmpeg.output(stream, output_path, c="copy")
 
-            ffmpeg.run(stream, overwrite_output=True)
+            await run_ffmpeg(stream, ctx)
             return f"Video trimmed successfully and saved to {output_path}"
         except ffmpeg.Error as e:
             await handle_ffmpeg_error(e, ctx)
@@ -117,7 +196,7 @@ def register_basic_video_tools(
         Raises:
             RuntimeError: If ffmpeg encounters an error during analysis.
         """
-        return get_video_metadata(video_path)
+        return await get_video_metadata_async(video_path)
     
     # Ensure function is registered with MCP
     del get_video_info
@@ -157,7 +236,7 @@ def register_basic_video_tools(
             raise ValueError("Provide exactly one: width, height, or scale")
 
         try:
-            stream = ffmpeg.input(input_path)
+            stream = ffmpeg.input(input_path, **hw_decode_options())
 
             if scale:
                 validate_range(
@@ -191,7 +270,7 @@ def register_basic_video_tools(
                 )
 
             output = create_standard_output(stream, output_path)
-            ffmpeg.run(output, overwrite_output=True)
+            await run_ffmpeg(output, ctx)
             return f"Video resized and saved to {output_path}"
         except ffmpeg.Error as e:
             await handle_ffmpeg_error(e, ctx)
@@ -208,9 +287,10 @@ def register_basic_video_tools(
     ) -> str:
         """Concatenate multiple videos into a single video.
 
-        Joins multiple video files into one continuous video. All input videos
-        should have the same resolution, frame rate, and codec for best results.
-        Videos with different properties will be automatically converted.
+        Joins multiple video files into one continuous video. Inputs in the
+        output's container with identical codecs and stream parameters are
+        joined by stream copy, without re-encoding. Videos with different
+        properties will be automatically converted.
 
         Args:
             input_paths: List of paths to video files to concatenate (min 2).
@@ -233,11 +313,15 @@ def register_basic_video_tools(
         )
 
         try:
-            inputs = [ffmpeg.input(path) for path in input_paths]
+            if await _can_concat_copy(input_paths, output_path):
+                await _concat_copy(input_paths, output_path, ctx)
+                return f"Videos concatenated successfully and saved to {output_path}"
+
+            inputs = [ffmpeg.input(path, **hw_decode_options()) for path in input_paths]
             # Concatenate without specifying stream counts - let ffmpeg auto-detect
             stream = ffmpeg.concat(*inputs)
             output = create_standard_output(stream, output_path)
-            ffmpeg.run(output, overwrite_output=True)
+            await run_ffmpeg(output, ctx)
             return f"Videos concatenated successfully and saved to {output_path}"
         except ffmpeg.Error as e:
             await handle_ffmpeg_error(e, ctx)
@@ -293,7 +377,7 @@ def register_basic_video_tools(
                 framerate=framerate,
             )
             output = create_standard_output(stream, output_path)
-            ffmpeg.run(output, overwrite_output=True)
+            await run_ffmpeg(output, ctx)
             return f"Video created successfully and saved to {output_path}"
         except ffmpeg.Error as e:
             await handle_ffmpeg_error(e, ctx)
@@ -31,10 +31,26 @@ import ffmpeg
 from fastmcp import Context, FastMCP
 
 from ..core import (
+    get_stream_codecs,
     handle_ffmpeg_error,
+    hw_decode_options,
     log_operation,
+    pick_video_encoder,
+    run_ffmpeg,
+    select_codec,
+    video_encoder_options,
 )
 
+# (video, audio) encoders per target format; None video means the default
+# H.264 encoder from pick_video_encoder().
+FORMAT_CODECS: dict[str, tuple[str | None, str]] = {
+    "mp4": (None, "aac"),
+    "avi": (None, "mp3"),
+    "mkv": (None, "aac"),
+    "webm": ("libvpx-vp9", "libvorbis"),
+    "mov": (None, "aac"),
+}
+
 
 def register_format_conversion_tools(
     mcp: FastMCP[None],
@@ -56,16 +72,18 @@ def register_format_conversion_tools(
         input_path: str,
         output_path: str,
         format: str | None = None,
-        video_codec: str = "libx264",
+        video_codec: str | None = None,
         audio_codec: str = "aac",
         video_bitrate: str | None = None,
-        audio_bitrate: str = "128k",
+        audio_bitrate: str | None = None,
         ctx: Context | None = None,
     ) -> str:
         """Convert video format and adjust encoding settings.
 
         Converts a video file to a different format with customizable codec
-        and bitrate settings for both video and audio streams.
+        and bitrate settings for both video and audio streams. Streams that
+        are already in the requested codec are stream-copied rather than
+        re-encoded, unless a bitrate is requested for them.
 
         Args:
             input_path: Path to the input video file.
@@ -73,9 +91,11 @@ def register_format_conversion_tools(
             format: Target format ("mp4", "avi", "mkv", "webm"). If specified,
                    auto-selects appropriate codecs.
             video_codec: Video codec ("libx264", "libx265", "libvpx-vp9", etc.).
+                   If None, encodes H.264, on a hardware encoder when one works.
             audio_codec: Audio codec ("aac", "mp3", "libvorbis", etc.).
             video_bitrate: Video bitrate (e.g., "1M", "2.5M"). If None, auto.
-            audio_bitrate: Audio bitrate (e.g., "128k", "192k", "320k").
+            audio_bitrate: Audio bitrate (e.g., "128k", "192k", "320k"). If None,
+                   copies matching audio as-is and encodes other audio at 128k.
             ctx: MCP context for progress reporting and logging.
 
         Returns:
@@ -85,44 +105,46 @@ def register_format_conversion_tools(
             RuntimeError: If ffmpeg encounters an error during processing.
         """
         # Auto-select codecs based on format if specified
-        if format:
-            format_codecs = {
-                "mp4": {"video": "libx264", "audio": "aac"},
-                "avi": {"video": "libx264", "audio": "mp3"},
-                "mkv": {"video": "libx264", "audio": "aac"},
-                "webm": {"video": "libvpx-vp9", "audio": "libvorbis"},
-                "mov": {"video": "libx264", "audio": "aac"},
-            }
-
-            if format.lower() in format_codecs:
-                selected = format_codecs[format.lower()]
-                video_codec = selected["video"]
-                audio_codec = selected["audio"]
-
-        await log_operation(
-            ctx,
-            f"Converting format: {video_codec}/{audio_codec} "
-            f"(vbr: {video_bitrate or 'auto'}, abr: {audio_bitrate})",
-        )
+        if format and format.lower() in FORMAT_CODECS:
+            video_codec, audio_codec = FORMAT_CODECS[format.lower()]
+
+        # H.264 by default, on a hardware encoder if enabled
+        video_codec = video_codec or pick_video_encoder()
 
         try:
-            stream = ffmpeg.input(input_path)
+            # Stream-copy whatever is already in the requested codec
+            source_video, source_audio = await get_stream_codecs(input_path)
+            if not video_bitrate:
+                video_codec = select_codec(video_codec, source_video)
+            if not audio_bitrate:
+                audio_codec = select_codec(audio_codec, source_audio)
+
+            await log_operation(
+                ctx,
+                f"Converting format: {video_codec}/{audio_codec} "
+                f"(vbr: {video_bitrate or 'auto'}, abr: {audio_bitrate or 'auto'})",
+            )
 
-            output_kwargs = {
-                "vcodec": video_codec,
-                "acodec": audio_codec,
-                "audio_bitrate": audio_bitrate,
-            }
+            # Decoding is only needed when the video is re-encoded
+            input_kwargs = hw_decode_options() if video_codec != "copy" else {}
+            stream = ffmpeg.input(input_path, **input_kwargs)
 
-            if video_bitrate:
-                output_kwargs["video_bitrate"] = video_bitrate
+            # An explicit bitrate replaces the encoder's quality settings
+            output_kwargs: dict[str, str | int] = (
+                {"vcodec": video_codec, "video_bitrate": video_bitrate}
+                if video_bitrate
+                else video_encoder_options(video_codec)
+            )
+            output_kwargs["acodec"] = audio_codec
+            if audio_codec != "copy":
+                output_kwargs["audio_bitrate"] = audio_bitrate or "128k"
 
             output = ffmpeg.output(
                 stream,
                 output_path,
                 **output_kwargs,
             )
-            ffmpeg.run(output, overwrite_output=True)
+            await run_ffmpeg(output, ctx)
             return f"Format converted successfully and saved to {output_path}"
         except ffmpeg.Error as e:
             await handle_ffmpeg_error(e, ctx)
@@ -1,7 +1,8 @@
-"""Video effects and filters: speed changes, filters, and thumbnails.
+"""Video effects and filters: speed changes, filters, thumbnails, and frames.
 
 This module provides advanced video manipulation tools including visual filters,
-speed changes, and thumbnail generation. Supports a wide range of effects from
+single-pass resize/filter/encode processing, speed changes, thumbnail
+generation, and batch frame extraction. Supports a wide range of effects from
 basic color adjustments to artistic filters like sepia, blur, and sharpening.
 
 Supported filters:
@@ -27,18 +28,122 @@ Example:
         )
 """
 
+import math
+from pathlib import Path
+
 import ffmpeg
 from fastmcp import Context, FastMCP
 
 from ..core import (
     create_standard_output,
+    get_video_metadata_async,
     handle_ffmpeg_error,
+    hw_decode_options,
     log_operation,
+    parse_scale_filter,
+    pick_video_encoder,
+    run_ffmpeg,
     validate_filter_name,
     validate_range,
+    video_encoder_options,
 )
 
 
+def _apply_named_filter(
+    stream: ffmpeg.Stream,
+    filter: str,
+    strength: float,
+) -> ffmpeg.Stream:
+    """Append the ffmpeg filter for one of apply_filter's named filters."""
+    if filter == "blur":
+        # Apply gaussian blur with strength controlling the blur radius
+        blur_radius = max(0.5, min(strength * 5, 10))  # Scale strength
+        stream = ffmpeg.filter(stream, "gblur", sigma=blur_radius)
+    elif filter == "brightness":
+        stream = ffmpeg.filter(
+            stream,
+            "eq",
+            brightness=strength - 1,
+        )
+    elif filter == "contrast":
+        stream = ffmpeg.filter(
+            stream,
+            "eq",
+            contrast=strength,
+        )
+    elif filter == "saturation":
+        stream = ffmpeg.filter(
+            stream,
+            "eq",
+            saturation=strength,
+        )
+    elif filter == "vintage":
+        # Apply vintage effect using color correction
+        stream = ffmpeg.filter(
+            stream,
+            "eq",
+            brightness=0.1 * strength,
+            contrast=1.2 * strength,
+            saturation=0.7 * strength,
+        )
+    elif filter == "sepia":
+        sepia_strength = min(strength, 1.0)
+        stream = ffmpeg.filter(
+            stream,
+            "colorchannelmixer",
+            rr=0.393 * sepia_strength,
+            rg=0.769 * sepia_strength,
+            rb=0.189 * sepia_strength,
+        )
+    elif filter == "grayscale":
+        stream = ffmpeg.filter(stream, "hue", s=1 - strength)
+    elif filter == "hflip":
+        stream = ffmpeg.filter(stream, "hflip")
+    elif filter == "sharpen":
+        # Apply unsharp mask for sharpening with strength controlling amount
+        sharpen_amount = max(0.1, min(strength, 3.0))  # Scale strength
+        stream = ffmpeg.filter(
+            stream,
+            "unsharp",
+            luma_msize_x=5,
+            luma_msize_y=5,
+            luma_amount=sharpen_amount,
+        )
+    elif filter.startswith("scale="):
+        # Handle scale filter with parameters like scale=640x360
+        width, height = parse_scale_filter(filter)
+        stream = ffmpeg.filter(stream, "scale", str(width), str(height))
+    return stream
+
+
+def _atempo_factors(speed: float) -> list[float]:
+    """Split a speed change into atempo factors within its 0.5-2.0 range.
+
+    Uses the fewest stages, ceil(|log2(speed)|), with an equal factor each,
+    which sounds better than 2.0 stages plus an odd remainder. The factors
+    multiply to speed; an empty list means no change.
+    """
+    if speed == 1.0:
+        return []
+    stages = max(1, math.ceil(abs(math.log2(speed))))
+    return [speed ** (1 / stages)] * stages
+
+
+def _image_output_options(path: str) -> dict[str, int]:
+    """Encoder options for a still image, chosen by its file extension.
+
+    JPEG is written near-visually-lossless (q 2) rather than at mjpeg's
+    blocky default; PNG uses fast zlib level 1, about three times quicker
+    than the default level for slightly larger files.
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix in (".jpg", ".jpeg"):
+        return {"qscale:v": 2}
+    if suffix == ".png":
+        return {"compression_level": 1}
+    return {}
+
+
 def register_video_effects_tools(
     mcp: FastMCP[None],
 ) -> None:
@@ -112,77 +217,116 @@ def register_video_effects_tools(
         )
 
         try:
-            stream: ffmpeg.Stream = ffmpeg.input(input_path)
-
-            # Apply different filters based on name
-            if filter == "blur":
-                # Apply gaussian blur with strength controlling the blur radius
-                blur_radius = max(0.5, min(strength * 5, 10))  # Scale strength
-                stream = ffmpeg.filter(stream, "gblur", sigma=blur_radius)
-            elif filter == "brightness":
-                stream = ffmpeg.filter(
-                    stream,
-                    "eq",
-                    brightness=strength - 1,
-                )
-            elif filter == "contrast":
-                stream = ffmpeg.filter(
-                    stream,
-                    "eq",
-                    contrast=strength,
-                )
-            elif filter == "saturation":
-                stream = ffmpeg.filter(
-                    stream,
-                    "eq",
-                    saturation=strength,
-                )
-            elif filter == "vintage":
-                # Apply vintage effect using color correction
-                stream = ffmpeg.filter(
-                    stream,
-                    "eq",
-                    brightness=0.1 * strength,
-                    contrast=1.2 * strength,
-                    saturation=0.7 * strength,
-                )
-            elif filter == "sepia":
-                sepia_strength = min(strength, 1.0)
-                stream = ffmpeg.filter(
-                    stream,
-                    "colorchannelmixer",
-                    rr=0.393 * sepia_strength,
-                    rg=0.769 * sepia_strength,
-                    rb=0.189 * sepia_strength,
-                )
-            elif filter == "grayscale":
-                stream = ffmpeg.filter(stream, "hue", s=1 - strength)
-            elif filter == "hflip":
-                stream = ffmpeg.filter(stream, "hflip")
-            elif filter == "sharpen":
-                # Apply unsharp mask for sharpening with strength controlling amount
-                sharpen_amount = max(0.1, min(strength, 3.0))  # Scale strength
-                stream = ffmpeg.filter(
-                    stream,
-                    "unsharp",
-                    luma_msize_x=5,
-                    luma_msize_y=5,
-                    luma_amount=sharpen_amount,
+            stream: ffmpeg.Stream = ffmpeg.input(input_path, **hw_decode_options())
+
+            stream = _apply_named_filter(stream, filter, strength)
+
+            output: ffmpeg.Stream = create_standard_output(stream, output_path)
+            await run_ffmpeg(output, ctx)
+            return f"{filter.title()} filter applied and saved to {output_path}"
+        except ffmpeg.Error as e:
+            await handle_ffmpeg_error(e, ctx)
+            # handle_ffmpeg_error raises, but we need a return for type checking
+            raise
+
+    @mcp.tool
+    async def process_video(
+        input_path: str,
+        output_path: str,
+        width: int | None = None,
+        height: int | None = None,
+        filter: str | None = None,
+        strength: float = 1.0,
+        video_codec: str | None = None,
+        video_bitrate: str | None = None,
+        ctx: Context | None = None,
+    ) -> str:
+        """Resize, filter and re-encode a video in a single pass.
+
+        Equivalent to running resize_video, apply_filter and convert_format
+        one after another, but the video is decoded and encoded only once,
+        which is several times faster and avoids stacking generation loss.
+        Every step is optional.
+
+        Args:
+            input_path: Path to the input video file.
+            output_path: Path where the processed video will be saved.
+            width: Target width in pixels. If only width or height is given,
+                the other is calculated to keep the aspect ratio.
+            height: Target height in pixels.
+            filter: Name of a filter supported by apply_filter, applied
+                after resizing.
+            strength: Filter intensity (0.1 to 3.0). 1.0 = normal strength.
+            video_codec: Video codec ("libx264", "libx265", "libvpx-vp9", etc.).
+                If None, encodes H.264.
+            video_bitrate: Video bitrate (e.g., "1M", "2.5M"). If None, auto.
+            ctx: MCP context for progress reporting and logging.
+
+        Returns:
+            Success message indicating the video was processed and saved.
+
+        Raises:
+            ValueError: If filter name or strength is invalid.
+            RuntimeError: If ffmpeg encounters an error during processing.
+
+        Example:
+            Downscale to 720p, boost contrast and encode to H.265:
+
+                result = await process_video(
+                    input_path="input.mp4",
+                    output_path="output.mp4",
+                    height=720,
+                    filter="contrast",
+                    strength=1.2,
+                    video_codec="libx265"
                 )
-            elif filter.startswith("scale="):
-                # Handle scale filter with parameters like scale=640:360
-                scale_params = filter.split("=")[1]
-                width, height = scale_params.split(":")
+        """
+        if filter is not None:
+            _ = validate_filter_name(filter)
+            validate_range(strength, 0.1, 3.0, "Filter strength")
+
+        await log_operation(
+            ctx,
+            f"Processing video (size: {width or 'auto'}x{height or 'auto'}, "
+            f"filter: {filter or 'none'}, codec: {video_codec or 'default'})",
+        )
+
+        try:
+            source: ffmpeg.Stream = ffmpeg.input(input_path, **hw_decode_options())
+            stream: ffmpeg.Stream = source["v"]
+
+            if width or height:
+                # -2 keeps the aspect ratio with an even size, as H.264 needs
                 stream = ffmpeg.filter(
                     stream,
                     "scale",
-                    str(int(width)),
-                    str(int(height)),
+                    str(width or -2),
+                    str(height or -2),
                 )
-
-            output: ffmpeg.Stream = create_standard_output(stream, output_path)
-            _ = ffmpeg.run(output, overwrite_output=True)
-            return f"{filter.title()} filter applied and saved to {output_path}"
+            if filter is not None:
+                stream = _apply_named_filter(stream, filter, strength)
+
+            # An explicit bitrate replaces the encoder's quality settings
+            output_kwargs: dict[str, str | int] = (
+                {
+                    "vcodec": video_codec or pick_video_encoder(),
+                    "video_bitrate": video_bitrate,
+                }
+                if video_bitrate
+                else video_encoder_options(video_codec)
+            )
+            # Carry the audio over like the separate tools do; "a?" also
+            # accepts inputs without an audio stream
+            output: ffmpeg.Stream = ffmpeg.output(
+                stream,
+                source["a?"],
+                output_path,
+                acodec="aac",
+                pix_fmt="yuv420p",
+                **output_kwargs,
+            )
+            await run_ffmpeg(output, ctx)
+            return f"Video processed and saved to {output_path}"
         except ffmpeg.Error as e:
             await handle_ffmpeg_error(e, ctx)
             # handle_ffmpeg_error raises, but we need a return for type checking
@@ -241,7 +385,7 @@ def register_video_effects_tools(
         )
 
         try:
-            stream: ffmpeg.Stream = ffmpeg.input(input_path)
+            stream: ffmpeg.Stream = ffmpeg.input(input_path, **hw_decode_options())
 
             # Apply speed change to video and audio
             video_stream: ffmpeg.Stream = ffmpeg.filter(
@@ -250,30 +394,18 @@ def register_video_effects_tools(
                 f"PTS/{speed}",
             )
 
-            # Handle atempo filter limitations (0.5-2.0 range)
-            # For speeds outside this range, chain multiple atempo filters
             audio_stream: ffmpeg.Stream = stream["a"]
-            current_speed = speed
-
-            while current_speed > 2.0:
-                audio_stream = ffmpeg.filter(audio_stream, "atempo", "2.0")
-                current_speed /= 2.0
-
-            while current_speed < 0.5:
-                audio_stream = ffmpeg.filter(audio_stream, "atempo", "0.5")
-                current_speed /= 0.5
-
-            if current_speed != 1.0:
-                audio_stream = ffmpeg.filter(audio_stream, "atempo", str(current_speed))
+            for factor in _atempo_factors(speed):
+                audio_stream = ffmpeg.filter(audio_stream, "atempo", str(factor))
 
             output: ffmpeg.Stream = ffmpeg.output(
                 video_stream,
                 audio_stream,
                 output_path,
-                vcodec="libx264",
+                **video_encoder_options(),
                 acodec="aac",
             )
-            _ = ffmpeg.run(output, overwrite_output=True)
+            await run_ffmpeg(output, ctx)
 
             speed_desc = "faster" if speed > 1.0 else "slower"
             return (
@@ -289,7 +421,7 @@ def register_video_effects_tools(
     async def generate_thumbnail(
         input_path: str,
         output_path: str,
-        timestamp: float = 2.5,
+        timestamp: float | None = None,
         width: int | None = None,
         height: int | None = None,
         ctx: Context | None = None,
@@ -297,12 +429,15 @@ def register_video_effects_tools(
         """Generate a thumbnail image from a video.
 
         Extracts a single frame from the video at the specified timestamp and
-        resizes it to create a thumbnail image.
+        resizes it to create a thumbnail image. Without a timestamp, ffmpeg's
+        thumbnail filter picks the most representative of the opening 100
+        frames, which avoids black frames and mid-cut blur.
 
         Args:
             input_path: Path to the input video file.
             output_path: Path where the thumbnail image will be saved.
             timestamp: Time in seconds to extract frame from (0.0 to video duration).
+                If None, picks a representative frame near the start.
             width: Thumbnail width in pixels (50 to 1920). If None, uses original width.
             height: Thumbnail height in pixels (50 to 1080). If None, uses original.
             ctx: MCP context for progress reporting and logging.
@@ -311,9 +446,11 @@ def register_video_effects_tools(
             Success message indicating thumbnail was generated and saved.
 
         Raises:
-            ValueError: If dimensions are out of valid ranges.
+            ValueError: If timestamp is negative or dimensions are out of range.
             RuntimeError: If ffmpeg encounters an error during processing.
         """
+        if timestamp is not None and timestamp < 0:
+            raise ValueError("Timestamp must not be negative")
         if width is not None:
             validate_range(width, 50, 1920, "Width")
         if height is not None:
@@ -326,11 +463,15 @@ def register_video_effects_tools(
         )
         await log_operation(
             ctx,
-            f"Generating {size_desc} thumbnail at {timestamp}s",
+            f"Generating {size_desc} thumbnail at "
+            + (f"{timestamp}s" if timestamp is not None else "best early frame"),
         )
 
         try:
-            stream: ffmpeg.Stream = ffmpeg.input(input_path, ss=timestamp)
+            if timestamp is not None:
+                stream: ffmpeg.Stream = ffmpeg.input(input_path, ss=timestamp)
+            else:
+                stream = ffmpeg.filter(ffmpeg.input(input_path), "thumbnail", 100)
 
             # Only apply scaling if dimensions are specified
             if width is not None or height is not None:
@@ -339,13 +480,141 @@ def register_video_effects_tools(
                 scale_height = height if height is not None else -1
                 stream = ffmpeg.filter(stream, "scale", str(scale_width), str(scale_height))
 
-            output: ffmpeg.Stream = ffmpeg.output(stream, output_path, vframes=1)
-            _ = ffmpeg.run(output, overwrite_output=True)
+            output: ffmpeg.Stream = ffmpeg.output(
+                stream, output_path, vframes=1, **_image_output_options(output_path)
+            )
+            await run_ffmpeg(output, ctx)
             return f"Thumbnail generated and saved to {output_path}"
         except ffmpeg.Error as e:
             await handle_ffmpeg_error(e, ctx)
             # handle_ffmpeg_error raises, but we need a return for type checking
             raise
     
+    @mcp.tool
+    async def extract_frames_batch(
+        input_path: str,
+        output_dir: str,
+        timestamps: list[float],
+        image_format: str = "png",
+        ctx: Context | None = None,
+    ) -> dict[float, str]:
+        """Extract frames at several timestamps in a single pass.
+
+        All frames are pulled by one ffmpeg process that reads the video
+        once, instead of one process and one demux per frame. Frame numbers
+        are derived from the video's frame rate, so timestamps on variable
+        frame rate footage are approximate.
+
+        Args:
+            input_path: Path to the input video file.
+            output_dir: Directory where the images will be saved as
+                frame_0001.<format>, frame_0002.<format>, ...
+            timestamps: Times in seconds of the frames to extract.
+            image_format: Image format of the frames ("png" or "jpg").
+            ctx: MCP context for progress reporting and logging.
+
+        Returns:
+            The saved image path for each timestamp. Images are numbered in
+            timeline order, and timestamps that fall on the same frame share
+            a single image. Existing images with the same names in
+            output_dir are replaced.
+
+        Raises:
+            ValueError: If no timestamps are given, one is negative or not
+                before the end of the video, or the image format is
+                unsupported.
+            RuntimeError: If ffmpeg encounters an error during processing.
+
+        Example:
+            Grab frames at one, two and four seconds:
+
+                frames = await extract_frames_batch(
+                    input_path="input.mp4",
+                    output_dir="frames",
+                    timestamps=[1.0, 2.0, 4.0]
+                )
+        """
+        if not timestamps:
+            raise ValueError("At least one timestamp required")
+        if min(timestamps) < 0:
+            raise ValueError("Timestamps must not be negative")
+        if image_format not in ("png", "jpg"):
+            raise ValueError("Image format must be one of: png, jpg")
+
+        metadata = await get_video_metadata_async(input_path)
+        duration = metadata["duration"]
+        if duration and max(timestamps) >= duration:
+            raise ValueError(
+                f"Timestamps must be before the end of the video ({duration}s)"
+            )
+
+        await log_operation(
+            ctx,
+            f"Extracting {len(timestamps)} frames from {input_path}",
+        )
+
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        pattern = str(Path(output_dir) / f"frame_%04d.{image_format}")
+
+        try:
+            # Image number (in timeline order) that each timestamp is saved as
+            image_numbers: dict[float, int]
+            if len(timestamps) == 1:
+                # A single frame is cheapest with a plain input seek
+                image_numbers = {timestamps[0]: 1}
+                stream: ffmpeg.Stream = ffmpeg.input(input_path, ss=timestamps[0])
+                output: ffmpeg.Stream = ffmpeg.output(
+                    stream, pattern, vframes=1, **_image_output_options(pattern)
+                )
+            else:
+                fps = metadata.get("video", {}).get("fps")
+                if not fps:
+                    raise ValueError(f"No video stream found in {input_path}")
+                frame_numbers = {t: round(t * fps) for t in timestamps}
+                frames = sorted(set(frame_numbers.values()))
+                image_of_frame = {frame: i + 1 for i, frame in enumerate(frames)}
+                image_numbers = {
+                    t: image_of_frame[frame] for t, frame in frame_numbers.items()
+                }
+                # Seek to half a frame before the first wanted frame so the
+                # frames before it are skipped by the demuxer, not decoded;
+                # frame numbers then count from that first frame.
+                first = frames[0]
+                input_kwargs = {"ss": (first - 0.5) / fps} if first else {}
+                stream = ffmpeg.filter(
+                    ffmpeg.input(input_path, **input_kwargs),
+                    "select",
+                    "+".join(f"eq(n,{frame - first})" for frame in frames),
+                )
+                # vsync 0 writes each selected frame once, without duplication
+                output = ffmpeg.output(
+                    stream,
+                    pattern,
+                    vframes=len(frames),
+                    vsync=0,
+                    **_image_output_options(pattern),
+                )
+
+            paths = {t: pattern % number for t, number in image_numbers.items()}
+            # Clear images left by an earlier call, so that only the files
+            # written by this run are reported below
+            for path in set(paths.values()):
+                Path(path).unlink(missing_ok=True)
+
+            await run_ffmpeg(output, ctx)
+            # A timestamp in the last half frame can round to a frame number
+            # the video does not have; only report images ffmpeg wrote
+            return {t: path for t, path in paths.items() if Path(path).exists()}
+        except ffmpeg.Error as e:
+            await handle_ffmpeg_error(e, ctx)
+            # handle_ffmpeg_error raises, but we need a return for type checking
+            raise
+
     # Mark decorated functions as used (they're accessed via the @mcp.tool decorator)
-    _ = (apply_filter, change_speed, generate_thumbnail)
+    _ = (
+        apply_filter,
+        process_video,
+        change_speed,
+        generate_thumbnail,
+        extract_frames_batch,
+    )
@@ -324,7 +324,7 @@ class TestThumbnailGeneration:
         Test thumbnail generation with default settings.
 
         This test verifies that generate_thumbnail correctly extracts
-        a frame from the middle of the video as a thumbnail.
+        a representative frame as a thumbnail.
         """
         output_path: Path = temp_dir / "thumbnail.jpg"
 
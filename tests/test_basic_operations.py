@@ -351,4 +351,30 @@ class TestResourceEndpoints:
                 assert video_info["width"] == 1280
         finally:
             # Restore original working directory
-            os.chdir(original_cwd)
\ No newline at end of file
+            os.chdir(original_cwd)
+
+    @pytest.mark.unit
+    async def test_advanced_tools_resource_etag(
+        self, mcp_server: FastMCP[None]
+    ) -> None:
+        """
+        Test conditional reads of the tools://advanced resource.
+
+        This test verifies that the catalog carries an etag, that reading
+        with the current etag returns an "unchanged" marker, and that a
+        stale etag returns the full catalog.
+        """
+        async with Client(mcp_server) as client:
+            result = await client.read_resource("tools://advanced/all")
+            catalog: dict[str, object] = json.loads(result[0].text)
+            assert "advanced_tools" in catalog
+            etag = cast(str, catalog["etag"])
+
+            # Current etag: nothing to resend
+            result = await client.read_resource(f"tools://advanced/all/{etag}")
+            unchanged: dict[str, object] = json.loads(result[0].text)
+            assert unchanged == {"unchanged": True, "etag": etag}
+
+            # Stale etag: full catalog
+            result = await client.read_resource("tools://advanced/all/stale")
+            assert json.loads(result[0].text) == catalog
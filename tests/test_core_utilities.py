@@ -0,0 +1,329 @@
+"""Tests for core helper functions.
+
+This module tests the shared helpers in vfx_mcp.core that the tools build
+on, such as the cached ffprobe wrapper and codec selection, and the pure
+helpers inside the tool modules. Uses pytest's
+monkeypatch fixture so most tests do not need to spawn ffmpeg.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from vfx_mcp.core import (
+    parse_color,
+    parse_scale_filter,
+    pick_video_encoder,
+    probe_media,
+    select_codec,
+    utilities,
+    video_encoder_options,
+)
+from vfx_mcp.tools.video_effects import _atempo_factors
+
+
+class TestProbeMedia:
+    """Test suite for the cached probe_media helper."""
+
+    @pytest.fixture(autouse=True)
+    def fake_ffprobe(self, monkeypatch: pytest.MonkeyPatch) -> list[str]:
+        """Replace the ffprobe subprocess with a call recorder."""
+        calls: list[str] = []
+
+        def run_ffprobe(path: str) -> dict[str, Any]:
+            calls.append(path)
+            return {"streams": [], "format": {"filename": path}}
+
+        utilities._probe_file.cache_clear()
+        monkeypatch.setattr(utilities, "_run_ffprobe", run_ffprobe)
+        return calls
+
+    @pytest.mark.unit
+    def test_repeat_probe_is_cached(
+        self, temp_dir: Path, fake_ffprobe: list[str]
+    ) -> None:
+        """Probing an unchanged file twice runs ffprobe once."""
+        media = temp_dir / "clip.mp4"
+        media.write_bytes(b"data")
+
+        first = probe_media(str(media))
+        second = probe_media(str(media))
+
+        assert first is second
+        assert len(fake_ffprobe) == 1
+
+    @pytest.mark.unit
+    def test_modified_file_is_probed_again(
+        self, temp_dir: Path, fake_ffprobe: list[str]
+    ) -> None:
+        """A change in size or mtime invalidates the cached report."""
+        media = temp_dir / "clip.mp4"
+        media.write_bytes(b"data")
+        probe_media(str(media))
+
+        media.write_bytes(b"more data")
+        os.utime(media, ns=(0, 0))
+        probe_media(str(media))
+
+        assert len(fake_ffprobe) == 2
+
+    @pytest.mark.unit
+    def test_missing_file_is_not_cached(self, fake_ffprobe: list[str]) -> None:
+        """Paths that cannot be stat'ed go straight to ffprobe every time."""
+        probe_media("missing.mp4")
+        probe_media("missing.mp4")
+
+        assert fake_ffprobe == ["missing.mp4", "missing.mp4"]
+
+
+class TestSelectCodec:
+    """Test suite for stream-copy codec selection."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        ("encoder", "source", "expected"),
+        [
+            ("libx264", "h264", "copy"),
+            ("libx265", "h264", "libx265"),
+            ("aac", "aac", "copy"),
+            ("libmp3lame", "aac", "libmp3lame"),
+            ("aac", None, "aac"),
+        ],
+    )
+    def test_select_codec(
+        self, encoder: str, source: str | None, expected: str
+    ) -> None:
+        """Matching source codecs are copied; anything else is encoded."""
+        assert select_codec(encoder, source) == expected
+
+
+class TestParseFrameRate:
+    """Test suite for ffprobe frame rate parsing."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        ("frame_rate", "expected"),
+        [
+            ("30/1", 30.0),
+            ("30000/1001", 30000 / 1001),
+            ("25", 25.0),
+            ("0/0", 0.0),
+            ("", 0.0),
+        ],
+    )
+    def test_parse_frame_rate(self, frame_rate: str, expected: float) -> None:
+        """Ratios, plain numbers and ffprobe's 0/0 placeholder all parse."""
+        assert utilities._parse_frame_rate(frame_rate) == pytest.approx(expected)
+
+
+class TestParseColor:
+    """Test suite for color parsing."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        ("color", "expected"),
+        [
+            ("green", "0x00FF00"),
+            ("Blue", "0x0000FF"),
+            ("#00ff00", "0x00ff00"),
+            ("0x00FF00", "0x00FF00"),
+            ("#00FF0080", "0x00FF0080"),
+        ],
+    )
+    def test_valid_colors(self, color: str, expected: str) -> None:
+        """Names and 6- or 8-digit hex codes map to ffmpeg's 0x form."""
+        assert parse_color(color) == expected
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("color", ["#0f0", "#00GG00", "0x00FF00:1", "chartreuse"])
+    def test_malformed_colors_are_rejected(self, color: str) -> None:
+        """Malformed hex is refused instead of being passed on to ffmpeg."""
+        with pytest.raises(ValueError):
+            parse_color(color)
+
+
+class TestParseScaleFilter:
+    """Test suite for scale filter parsing."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("filter_name", ["scale=640x360", "scale=640:360"])
+    def test_both_separators_parse(self, filter_name: str) -> None:
+        """Width and height may be separated by "x" or ":"."""
+        assert parse_scale_filter(filter_name) == (640, 360)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        ("filter_name", "expected"),
+        [("scale=-1:720", (-1, 720)), ("scale=1280:-2", (1280, -2))],
+    )
+    def test_automatic_side_parses(
+        self, filter_name: str, expected: tuple[int, int]
+    ) -> None:
+        """-1 and -2 keep the aspect ratio, as ffmpeg's scale filter allows."""
+        assert parse_scale_filter(filter_name) == expected
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "filter_name",
+        [
+            "scale=640",
+            "scale=0x360",
+            "scale=640:0",
+            "scale=-3:720",
+            "scale=640x360,hflip",
+            "scale=iw/2:ih/2",
+        ],
+    )
+    def test_malformed_scale_is_rejected(self, filter_name: str) -> None:
+        """Anything but positive integers or -1/-2 is refused, not run."""
+        with pytest.raises(ValueError):
+            parse_scale_filter(filter_name)
+
+
+class TestPickVideoEncoder:
+    """Test suite for hardware encoder selection."""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self) -> Any:
+        """Run each test against a fresh encoder selection."""
+        pick_video_encoder.cache_clear()
+        yield
+        pick_video_encoder.cache_clear()
+
+    @pytest.mark.unit
+    def test_libx264_unless_opted_in(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Without VFX_MCP_HW_ENCODE=1, detection is skipped entirely."""
+        monkeypatch.delenv("VFX_MCP_HW_ENCODE", raising=False)
+        monkeypatch.setattr(utilities, "_encoder_works", lambda encoder: True)
+
+        assert pick_video_encoder() == "libx264"
+
+    @pytest.mark.unit
+    def test_listed_but_broken_encoder_is_skipped(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """An encoder that fails its test encode is never selected."""
+        monkeypatch.setenv("VFX_MCP_HW_ENCODE", "1")
+        monkeypatch.setattr(utilities, "_encoder_works", lambda encoder: False)
+
+        assert pick_video_encoder() == "libx264"
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("encoder", utilities.HW_H264_ENCODERS)
+    def test_hardware_encoders_get_quality_settings(self, encoder: str) -> None:
+        """Every hardware encoder is paired with a constant-quality setting."""
+        options = video_encoder_options(encoder)
+
+        assert options["vcodec"] == encoder
+        assert len(options) > 1
+
+    @pytest.mark.unit
+    def test_libx264_keeps_its_default_crf(self) -> None:
+        """libx264 needs no extra options; its default is CRF 23."""
+        assert video_encoder_options("libx264") == {"vcodec": "libx264"}
+
+
+class TestForwardProgress:
+    """Test suite for relaying ffmpeg -progress output."""
+
+    @pytest.mark.unit
+    async def test_out_time_is_reported_against_duration(self) -> None:
+        """out_time_us lines become progress in seconds of the input duration."""
+        reports: list[tuple[float, float | None]] = []
+
+        class FakeContext:
+            async def report_progress(
+                self, progress: float, total: float | None = None
+            ) -> None:
+                reports.append((progress, total))
+
+        stdout = asyncio.StreamReader()
+        stdout.feed_data(
+            b"frame=1\nout_time_us=N/A\nout_time_us=1500000\n"
+            b"progress=continue\nout_time_us=3000000\nprogress=end\n"
+        )
+        stdout.feed_eof()
+        stderr_tail = bytearray(b"  Duration: 00:01:02.50, start: 0.000000")
+
+        await utilities._forward_progress(stdout, stderr_tail, FakeContext())  # type: ignore[arg-type]
+
+        assert reports == [(1.5, 62.5), (3.0, 62.5)]
+
+    @pytest.mark.unit
+    async def test_multi_input_graph_reports_no_total(self) -> None:
+        """The first input's duration is not the total of a multi-input graph."""
+        reports: list[tuple[float, float | None]] = []
+
+        class FakeContext:
+            async def report_progress(
+                self, progress: float, total: float | None = None
+            ) -> None:
+                reports.append((progress, total))
+
+        stdout = asyncio.StreamReader()
+        stdout.feed_data(b"out_time_us=1500000\nprogress=end\n")
+        stdout.feed_eof()
+        stderr_tail = bytearray(b"  Duration: 00:00:02.00, start: 0.000000")
+
+        await utilities._forward_progress(
+            stdout, stderr_tail, FakeContext(), with_total=False  # type: ignore[arg-type]
+        )
+
+        assert reports == [(1.5, None)]
+
+
+class TestFfmpegSlots:
+    """Test suite for the per-loop ffmpeg concurrency limit."""
+
+    @pytest.mark.unit
+    def test_contended_slots_work_across_event_loops(self) -> None:
+        """Waiting on the limit in one loop must not break it for the next."""
+
+        async def contend() -> None:
+            slots = utilities._ffmpeg_slots_for_running_loop()
+            for _ in range(utilities.MAX_CONCURRENT_FFMPEG):
+                await slots.acquire()
+            waiter = asyncio.create_task(slots.acquire())
+            await asyncio.sleep(0)
+            slots.release()
+            await waiter
+            for _ in range(utilities.MAX_CONCURRENT_FFMPEG):
+                slots.release()
+
+        asyncio.run(contend())
+        asyncio.run(contend())
+
+
+class TestAtempoFactors:
+    """Test suite for splitting speed changes into atempo stages."""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        ("speed", "expected"),
+        [
+            (1.0, []),
+            (3.0, [math.sqrt(3.0)] * 2),
+            (0.3, [math.sqrt(0.3)] * 2),
+            (4.0, [2.0, 2.0]),
+            (0.25, [0.5, 0.5]),
+            (1.5, [1.5]),
+        ],
+    )
+    def test_fewest_equal_stages(self, speed: float, expected: list[float]) -> None:
+        """Speeds are split into ceil(|log2(speed)|) equal factors."""
+        assert _atempo_factors(speed) == pytest.approx(expected)
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("speed", [0.25, 0.3, 0.5, 0.75, 1.5, 2.0, 3.0, 4.0])
+    def test_factors_stay_in_range_and_multiply_to_speed(self, speed: float) -> None:
+        """Every factor is within atempo's 0.5-2.0 range."""
+        factors = _atempo_factors(speed)
+
+        assert all(0.5 <= factor <= 2.0 for factor in factors)
+        assert math.prod(factors) == pytest.approx(speed)
@@ -206,6 +206,75 @@ class TestBasicVideoOperationsE2E:
             assert video_stream["height"] == 240
             assert video_stream["width"] == 320  # Maintains aspect ratio
 
+    @pytest.mark.integration
+    async def test_concatenation_with_quote_in_path(
+        self, sample_videos: list[Path], temp_dir: Path, mcp_server: FastMCP[None]
+    ) -> None:
+        """Test stream-copy concatenation of inputs whose paths contain quotes.
+
+        This test checks quotes in input paths are escaped in the concat
+        demuxer's list file instead of ending the quoted path early.
+        """
+        # Two copies of one clip, so the inputs are certain to be copyable
+        quoted_paths: list[Path] = []
+        for i in range(2):
+            quoted_path = temp_dir / f"it's clip {i}.mp4"
+            quoted_path.write_bytes(sample_videos[0].read_bytes())
+            quoted_paths.append(quoted_path)
+        concat_path = temp_dir / "quoted_concat.mp4"
+
+        async with Client(mcp_server) as client:
+            _ = await client.call_tool(
+                "concatenate_videos",
+                {
+                    "input_paths": [str(p) for p in quoted_paths],
+                    "output_path": str(concat_path),
+                },
+            )
+
+        probe = ffmpeg.probe(str(concat_path))
+        duration = float(probe["format"]["duration"])
+        assert 3.9 <= duration <= 4.1  # two 2-second clips
+
+    @pytest.mark.integration
+    async def test_concatenation_of_mismatched_profiles(
+        self, sample_videos: list[Path], temp_dir: Path, mcp_server: FastMCP[None]
+    ) -> None:
+        """Test that inputs with different H.264 profiles are re-encoded.
+
+        Stream-copying would keep only the first input's Constrained Baseline
+        headers, so the output being High profile shows the inputs were
+        re-encoded instead.
+        """
+        baseline_path = temp_dir / "baseline.mp4"
+        ffmpeg.run(
+            ffmpeg.output(
+                ffmpeg.input("testsrc=duration=2:size=640x480:rate=24", f="lavfi"),
+                str(baseline_path),
+                vcodec="libx264",
+                profile="baseline",
+                preset="ultrafast",
+                pix_fmt="yuv420p",
+            ),
+            overwrite_output=True,
+            quiet=True,
+        )
+        concat_path = temp_dir / "mixed_concat.mp4"
+
+        async with Client(mcp_server) as client:
+            _ = await client.call_tool(
+                "concatenate_videos",
+                {
+                    "input_paths": [str(baseline_path), str(sample_videos[0])],
+                    "output_path": str(concat_path),
+                },
+            )
+
+        probe = ffmpeg.probe(str(concat_path))
+        video_stream = next(s for s in probe["streams"] if s["codec_type"] == "video")
+        assert video_stream["profile"] == "High"
+        assert 3.9 <= float(probe["format"]["duration"]) <= 4.1
+
     @pytest.mark.integration
     async def test_resize_variations_workflow(self, sample_video: Path, temp_dir: Path, mcp_server: FastMCP[None]) -> None:
         """Test different resize operations in a workflow.
@@ -1,12 +1,14 @@
 """End-to-end tests for video effects and filters.
 
 This module provides comprehensive end-to-end testing for video effects
-tools including apply_filter, change_speed, and generate_thumbnail.
+tools including apply_filter, change_speed, generate_thumbnail and the
+compositing tools.
 Tests cover realistic workflows and complete operations from input to output validation.
 """
 
 from __future__ import annotations
 
+import json
 from pathlib import Path
 from typing import TYPE_CHECKING, TypedDict, cast
 
@@ -226,6 +228,40 @@ class TestVideoEffectsE2E:
                 assert video_stream["width"] == 1280
                 assert video_stream["height"] == 720
 
+    @pytest.mark.integration
+    async def test_process_video_single_pass(
+        self, sample_video: Path, temp_dir: Path, mcp_server: FastMCP[None]
+    ) -> None:
+        """Test resizing, filtering and encoding in one process_video call.
+
+        This test checks the fused tool produces the same result as the
+        resize_video and apply_filter steps it replaces.
+        """
+        async with Client(mcp_server) as client:
+            output_path: Path = temp_dir / "processed.mp4"
+            await client.call_tool(
+                "process_video",
+                {
+                    "input_path": str(sample_video),
+                    "output_path": str(output_path),
+                    "width": 640,
+                    "filter": "contrast",
+                    "strength": 1.2,
+                },
+            )
+            assert output_path.exists()
+
+            probe_result = ffmpeg.probe(str(output_path))
+            probe_data = cast(ProbeData, probe_result)
+            video_stream = next(
+                s for s in probe_data["streams"] if s["codec_type"] == "video"
+            )
+            assert video_stream["width"] == 640
+            assert video_stream["height"] == 360
+            assert video_stream["codec_name"] == "h264"
+            # Resizing and filtering must not drop the input's audio
+            assert any(s["codec_type"] == "audio" for s in probe_data["streams"])
+
     @pytest.mark.integration
     async def test_thumbnail_generation_variations(
         self, sample_video: Path, temp_dir: Path, mcp_server: FastMCP[None]
@@ -709,6 +745,70 @@ class TestVideoEffectsE2E:
                     },
                 )
 
+    @pytest.mark.integration
+    async def test_extract_frames_batch(
+        self, sample_video: Path, temp_dir: Path, mcp_server: FastMCP[None]
+    ) -> None:
+        """Test extracting several frames with one extract_frames_batch call.
+
+        This test checks one image is written per distinct frame, with
+        repeated timestamps collapsed into a single image, that each
+        timestamp maps to its image, and that a leftover image from an
+        earlier run is replaced.
+        """
+        frames_dir: Path = temp_dir / "frames"
+        frames_dir.mkdir()
+        (frames_dir / "frame_0002.png").write_bytes(b"stale")
+
+        async with Client(mcp_server) as client:
+            result = await client.call_tool(
+                "extract_frames_batch",
+                {
+                    "input_path": str(sample_video),
+                    "output_dir": str(frames_dir),
+                    "timestamps": [3.0, 0.5, 1.5, 1.5],
+                },
+            )
+
+        assert json.loads(result[0].text) == {
+            "0.5": str(frames_dir / "frame_0001.png"),
+            "1.5": str(frames_dir / "frame_0002.png"),
+            "3.0": str(frames_dir / "frame_0003.png"),
+        }
+        frame_paths = sorted(str(path) for path in frames_dir.glob("*.png"))
+        assert frame_paths == [
+            str(frames_dir / f"frame_{i:04d}.png") for i in range(1, 4)
+        ]
+        for frame_path in frame_paths:
+            frame_probe = cast(ProbeData, ffmpeg.probe(frame_path))
+            frame_stream = frame_probe["streams"][0]
+            assert frame_stream["width"] == 1280
+            assert frame_stream["height"] == 720
+
+    @pytest.mark.integration
+    async def test_extract_frames_batch_past_end(
+        self, sample_video: Path, temp_dir: Path, mcp_server: FastMCP[None]
+    ) -> None:
+        """Test that timestamps past the end of the video are rejected.
+
+        This test checks no images are written when one of the requested
+        frames does not exist, rather than returning paths to missing files.
+        """
+        frames_dir: Path = temp_dir / "frames"
+
+        async with Client(mcp_server) as client:
+            with pytest.raises(ToolError):
+                await client.call_tool(
+                    "extract_frames_batch",
+                    {
+                        "input_path": str(sample_video),
+                        "output_dir": str(frames_dir),
+                        "timestamps": [0.5, 1.0, 60.0],
+                    },
+                )
+
+        assert not list(frames_dir.glob("*.png"))
+
     @pytest.mark.integration
     async def test_thumbnail_timestamp_handling(
         self, sample_video: Path, temp_dir: Path, mcp_server: FastMCP[None]
@@ -754,4 +854,100 @@ class TestVideoEffectsE2E:
                     s for s in thumb_probe["streams"] if s["codec_type"] == "video"
                 )
                 assert thumb_stream["width"] == 320
-                assert thumb_stream["height"] == 240
\ No newline at end of file
+                assert thumb_stream["height"] == 240
+
+
+class TestCompositingE2E:
+    """End-to-end tests for the advanced compositing tools."""
+
+    @pytest.mark.integration
+    async def test_green_screen_still_background(
+        self, sample_video: Path, temp_dir: Path, mcp_server: FastMCP[None]
+    ) -> None:
+        """Test keying over a still image background.
+
+        This test checks the looped still is cut off when the foreground
+        video ends, instead of being repeated forever.
+        """
+        background_path: Path = temp_dir / "background.png"
+        ffmpeg.run(
+            ffmpeg.output(
+                ffmpeg.input("color=c=blue:size=1280x720", f="lavfi"),
+                str(background_path),
+                vframes=1,
+            ),
+            overwrite_output=True,
+            quiet=True,
+        )
+        output_path: Path = temp_dir / "keyed_still.mp4"
+
+        async with Client(mcp_server) as client:
+            await client.call_tool(
+                "create_green_screen_effect",
+                {
+                    "input_path": str(sample_video),
+                    "output_path": str(output_path),
+                    "background_path": str(background_path),
+                },
+            )
+
+        probe_data = cast(ProbeData, ffmpeg.probe(str(output_path)))
+        assert abs(float(probe_data["format"]["duration"]) - 5.0) < 0.5
+
+    @pytest.mark.integration
+    async def test_green_screen_shorter_video_background(
+        self,
+        sample_video: Path,
+        sample_videos: list[Path],
+        temp_dir: Path,
+        mcp_server: FastMCP[None],
+    ) -> None:
+        """Test keying over a video background shorter than the foreground.
+
+        This test checks the whole foreground is kept when the background
+        video runs out first.
+        """
+        output_path: Path = temp_dir / "keyed_video.mp4"
+
+        async with Client(mcp_server) as client:
+            await client.call_tool(
+                "create_green_screen_effect",
+                {
+                    "input_path": str(sample_video),
+                    "output_path": str(output_path),
+                    "background_path": str(sample_videos[0]),
+                },
+            )
+
+        probe_data = cast(ProbeData, ffmpeg.probe(str(output_path)))
+        assert float(probe_data["format"]["duration"]) > 4.5
+
+    @pytest.mark.integration
+    async def test_motion_blur_at_angle(
+        self, sample_video: Path, temp_dir: Path, mcp_server: FastMCP[None]
+    ) -> None:
+        """Test directional motion blur at a diagonal angle.
+
+        This test checks the blurred video keeps the input's dimensions and
+        length.
+        """
+        output_path: Path = temp_dir / "motion_blur.mp4"
+
+        async with Client(mcp_server) as client:
+            await client.call_tool(
+                "apply_motion_blur",
+                {
+                    "input_path": str(sample_video),
+                    "output_path": str(output_path),
+                    "blur_strength": 2.0,
+                    "angle": 45.0,
+                },
+            )
+
+        probe_data = cast(ProbeData, ffmpeg.probe(str(output_path)))
+        video_stream = next(
+            s for s in probe_data["streams"] if s["codec_type"] == "video"
+        )
+        assert video_stream["width"] == 1280
+        assert video_stream["height"] == 720
+        assert abs(float(probe_data["format"]["duration"]) - 5.0) < 0.5